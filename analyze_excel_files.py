@@ -1,5 +1,241 @@
-import pandas as pd
+import hashlib
+import io
+import mmap
+import os
+import pickle
+import re
 import sys
+import traceback
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import column_index_from_string
+
+# python-calamine (pip install python-calamine) parses xlsx/xlsm in Rust and is
+# much faster than openpyxl; without it pandas falls back to openpyxl
+try:
+    import python_calamine  # noqa: F401
+    engine = 'calamine'
+except ImportError:
+    engine = 'openpyxl'
+
+CATEGORY_PATTERNS = {
+    'article': re.compile(r'art|item|artikel|material', re.I),
+    'project': re.compile(r'proj|project|auftrag', re.I),
+    'quantity': re.compile(r'qty|quantity|menge|anzahl', re.I),
+    'date': re.compile(r'date|datum|termin', re.I),
+    'status': re.compile(r'status|state|zustand', re.I),
+}
+
+# Per-file analysis results, reused while a workbook's mtime and size are unchanged
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'neubau')
+
+# Part of every cache key; bump it when a change alters the cached results
+CACHE_VERSION = 2
+
+# XML namespaces of the xlsx parts read by peek_xlsx
+XLSX_NS = {
+    'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+    'rel': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'pkg': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+
+
+class _ReadOnlyMap(mmap.mmap):
+    """mmap with the seekable() that zipfile needs before Python 3.13"""
+
+    def seekable(self):
+        return True
+
+
+def map_file(filepath):
+    """Map a file read-only into memory; use it as a context manager"""
+    with open(filepath, 'rb') as f:
+        return _ReadOnlyMap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_head(filepath, nrows=5):
+    """Read only the first rows of the first sheet into a DataFrame"""
+    with pd.ExcelFile(filepath, engine=engine) as xl:
+        return xl.parse(xl.sheet_names[0], nrows=nrows)
+
+
+def _first_sheet_path(archive):
+    """Resolve the zip member holding the first worksheet of a workbook"""
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rel_id = workbook.find('main:sheets/main:sheet', XLSX_NS).get(f"{{{XLSX_NS['rel']}}}id")
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.findall('pkg:Relationship', XLSX_NS):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            return target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+    raise KeyError(f"Worksheet relationship {rel_id} not found")
+
+
+def _read_shared_strings(archive, count):
+    """Read the first `count` entries of the shared strings table"""
+    strings = []
+    if count == 0 or 'xl/sharedStrings.xml' not in archive.namelist():
+        return strings
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, el in ET.iterparse(f):
+            if el.tag == f"{{{XLSX_NS['main']}}}si":
+                strings.append(''.join(t.text or '' for t in el.iter(f"{{{XLSX_NS['main']}}}t")))
+                el.clear()
+                if len(strings) == count:
+                    break
+    return strings
+
+
+def peek_xlsx(filepath):
+    """Read the header row and the number of data rows of the first sheet
+
+    Streams the worksheet XML straight out of the zip: only the header cells
+    are decoded, and shared strings are read only as far as the header needs.
+    Like pd.read_excel, the header is sheet row 1 and the data rows run up to
+    the last row holding a value, so skipped row numbers count and formatted
+    but empty rows at the end do not. Returns (column_names, data_rows).
+    """
+    row_tag = f"{{{XLSX_NS['main']}}}row"
+    sheet_data_tag = f"{{{XLSX_NS['main']}}}sheetData"
+    with map_file(filepath) as buf, zipfile.ZipFile(buf) as archive:
+        header_cells = None
+        row_number = last_value_row = 0
+        sheet_data = None
+        with archive.open(_first_sheet_path(archive)) as f:
+            for event, el in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    if el.tag == sheet_data_tag:
+                        sheet_data = el
+                    continue
+                if el.tag != row_tag:
+                    continue
+                # r is optional; without it the row follows the previous one
+                ref = el.get('r')
+                row_number = int(ref) if ref else row_number + 1
+                if row_number == 1:
+                    header_cells = [
+                        (cell.get('r'), cell.get('t'),
+                         cell.findtext('main:v', namespaces=XLSX_NS),
+                         ''.join(t.text or '' for t in cell.iter(f"{{{XLSX_NS['main']}}}t")))
+                        for cell in el.findall('main:c', XLSX_NS)
+                    ]
+                if (el.find('main:c/main:v', XLSX_NS) is not None
+                        or el.find('main:c/main:is', XLSX_NS) is not None):
+                    last_value_row = row_number
+                # Detach the finished row so memory stays flat on long sheets
+                el.clear()
+                if sheet_data is not None:
+                    sheet_data.remove(el)
+
+        header_cells = header_cells or []
+        shared_indices = [int(v) for _, t, v, _ in header_cells if t == 's' and v is not None]
+        shared = _read_shared_strings(archive, max(shared_indices, default=-1) + 1)
+
+    column_names = []
+    for position, (ref, cell_type, value, inline_text) in enumerate(header_cells, 1):
+        if ref:
+            position = column_index_from_string(ref.rstrip('0123456789'))
+        column_names.extend([None] * (position - len(column_names) - 1))
+        if cell_type == 's' and value is not None:
+            column_names.append(shared[int(value)])
+        elif cell_type == 'inlineStr':
+            column_names.append(inline_text)
+        else:
+            column_names.append(value)
+
+    return column_names, max(last_value_row - 1, 0)
+
+
+def count_quantity(filepath, qty_col):
+    """Count the rows where column qty_col (1-based) is 0 and > 0
+
+    Only that single column is materialized. Returns (zero, non_zero).
+    """
+    if engine == 'calamine':
+        # calamine decodes the sheet in Rust; pandas keeps just the one column
+        column = pd.read_excel(filepath, engine='calamine', usecols=[qty_col - 1]).iloc[:, 0]
+        values = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        with map_file(filepath) as buf:
+            wb = load_workbook(buf, read_only=True, data_only=True)
+            try:
+                sheet = wb.worksheets[0]
+                # Raw cell values, not their formatted text; the stored
+                # dimension is dropped so a stale one cannot cut rows off
+                sheet.reset_dimensions()
+                values = np.fromiter(
+                    (value if isinstance(value, (int, float)) else np.nan
+                     for (value,) in sheet.iter_rows(min_row=2, min_col=qty_col, max_col=qty_col,
+                                                     values_only=True)),
+                    dtype=np.float64,
+                )
+            finally:
+                wb.close()
+
+    # Non-numeric cells are NaN, which neither == 0 nor > 0 matches
+    return int(np.count_nonzero(values == 0)), int(np.count_nonzero(values > 0))
+
+
+def _cache_path(filepath):
+    """Cache file for the current version of filepath read by the current readers
+
+    Named 'report-<file>-<version>.pkl'; <version> covers mtime, size, the
+    engine and CACHE_VERSION, so installing python-calamine or changing the
+    code invalidates old entries.
+    """
+    st = os.stat(filepath)
+    file_key = hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()[:16]
+    version = f"{st.st_mtime_ns}:{st.st_size}:{engine}:{CACHE_VERSION}"
+    version_key = hashlib.sha1(version.encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"report-{file_key}-{version_key}.pkl")
+
+
+def read_workbook(filepath):
+    """Read everything the report needs from a workbook, cached on disk
+
+    Returns (header, total_rows, head_df, quantity_counts); quantity_counts is
+    (zero, non_zero) or None when there is no QuantityRem1 column. An unchanged
+    file is loaded from CACHE_DIR instead of being parsed again.
+    """
+    cache_path = _cache_path(filepath)
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass  # missing or unreadable cache entry, parse the workbook
+
+    header, total_rows = peek_xlsx(filepath)
+    df = read_head(filepath)
+    quantity_counts = None
+    if 'QuantityRem1' in header:
+        quantity_counts = count_quantity(filepath, header.index('QuantityRem1') + 1)
+    result = (header, total_rows, df, quantity_counts)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return result  # caching is best effort
+
+    # Drop the entries written for older versions of this workbook
+    cache_name = os.path.basename(cache_path)
+    file_prefix = cache_name.rsplit('-', 1)[0]
+    for entry in os.listdir(CACHE_DIR):
+        if entry.startswith(f"{file_prefix}-") and entry != cache_name:
+            try:
+                os.remove(os.path.join(CACHE_DIR, entry))
+            except OSError:
+                pass
+    return result
+
 
 # File paths
 files = {
@@ -8,72 +244,86 @@ files = {
     'Project Management (Controlling)': 'Controlling.xlsx'
 }
 
-for name, filepath in files.items():
-    print(f"\n{'='*80}")
-    print(f"FILE: {name}")
-    print(f"Path: {filepath}")
-    print('='*80)
+def analyze_excel_file(filepath, name):
+    """Analyze one Excel file and return the report as a string"""
+    out = io.StringIO()
+    print(f"\n{'='*80}", file=out)
+    print(f"FILE: {name}", file=out)
+    print(f"Path: {filepath}", file=out)
+    print('='*80, file=out)
 
     try:
-        # Read the Excel file
-        if filepath.endswith('.xlsm'):
-            df = pd.read_excel(filepath, engine='openpyxl')
-        else:
-            df = pd.read_excel(filepath)
+        # Header and row count come from the raw sheet XML, the sample from
+        # a 5-row read; only the QuantityRem1 column is read in full
+        header, total_rows, df, quantity_counts = read_workbook(filepath)
 
         # Display basic info
-        print(f"\nTotal rows: {len(df)}")
-        print(f"Total columns: {len(df.columns)}")
+        print(f"\nTotal rows: {total_rows}", file=out)
+        print(f"Total columns: {len(df.columns)}", file=out)
 
         # Display all column names
-        print("\nALL COLUMN NAMES:")
-        for i, col in enumerate(df.columns, 1):
-            print(f"  {i}. {col}")
+        print("\nALL COLUMN NAMES:", file=out)
+        out.write("".join(f"  {i}. {col}\n" for i, col in enumerate(df.columns, 1)))
 
         # Display first 5 rows
-        print("\nFIRST 5 ROWS (SAMPLE DATA):")
-        print(df.head(5).to_string())
+        print("\nFIRST 5 ROWS (SAMPLE DATA):", file=out)
+        df.head(5).to_csv(out, sep='\t', index=False)
 
         # Check for specific columns
-        print("\n\nCOLUMN ANALYSIS:")
+        print("\n\nCOLUMN ANALYSIS:", file=out)
+
+        # Column names as strings once, so the vectorized matchers accept any header
+        column_index = df.columns.astype(str)
 
         # Look for Article Number columns
-        article_candidates = [col for col in df.columns if any(x in col.lower() for x in ['art', 'item', 'artikel', 'material'])]
+        article_candidates = df.columns[column_index.str.contains(CATEGORY_PATTERNS['article'])].tolist()
         if article_candidates:
-            print(f"  Potential Article Number columns: {article_candidates}")
+            print(f"  Potential Article Number columns: {article_candidates}", file=out)
 
         # Look for Project Number columns
-        project_candidates = [col for col in df.columns if any(x in col.lower() for x in ['proj', 'project', 'auftrag'])]
+        project_candidates = df.columns[column_index.str.contains(CATEGORY_PATTERNS['project'])].tolist()
         if project_candidates:
-            print(f"  Potential Project Number columns: {project_candidates}")
+            print(f"  Potential Project Number columns: {project_candidates}", file=out)
 
         # Look for quantity columns
-        qty_candidates = [col for col in df.columns if any(x in col.lower() for x in ['qty', 'quantity', 'menge', 'anzahl'])]
+        qty_candidates = df.columns[column_index.str.contains(CATEGORY_PATTERNS['quantity'])].tolist()
         if qty_candidates:
-            print(f"  Potential Quantity columns: {qty_candidates}")
+            print(f"  Potential Quantity columns: {qty_candidates}", file=out)
 
         # Look for date columns
-        date_candidates = [col for col in df.columns if any(x in col.lower() for x in ['date', 'datum', 'termin'])]
+        date_candidates = df.columns[column_index.str.contains(CATEGORY_PATTERNS['date'])].tolist()
         if date_candidates:
-            print(f"  Potential Date columns: {date_candidates}")
+            print(f"  Potential Date columns: {date_candidates}", file=out)
 
         # Look for status columns
-        status_candidates = [col for col in df.columns if any(x in col.lower() for x in ['status', 'state', 'zustand'])]
+        status_candidates = df.columns[column_index.str.contains(CATEGORY_PATTERNS['status'])].tolist()
         if status_candidates:
-            print(f"  Potential Status columns: {status_candidates}")
+            print(f"  Potential Status columns: {status_candidates}", file=out)
 
         # Special check for Sales file - QuantityRem1
-        if 'QuantityRem1' in df.columns:
-            print(f"\n  *** IMPORTANT: Found 'QuantityRem1' column ***")
-            print(f"      - Rows where QuantityRem1 = 0: {len(df[df['QuantityRem1'] == 0])}")
-            print(f"      - Rows where QuantityRem1 > 0: {len(df[df['QuantityRem1'] > 0])}")
-            print(f"      - These rows with 0 should be skipped (already delivered)")
+        if quantity_counts is not None:
+            zero_count, non_zero_count = quantity_counts
+            print(f"\n  *** IMPORTANT: Found 'QuantityRem1' column ***", file=out)
+            print(f"      - Rows where QuantityRem1 = 0: {zero_count}", file=out)
+            print(f"      - Rows where QuantityRem1 > 0: {non_zero_count}", file=out)
+            print(f"      - These rows with 0 should be skipped (already delivered)", file=out)
 
+    except OSError as e:
+        print(f"\nERROR reading file: {str(e)}", file=out)
     except Exception as e:
-        print(f"\nERROR reading file: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        print(f"\nERROR reading file: {str(e)}", file=out)
+        traceback.print_exc(file=out)
+
+    return out.getvalue()
+
+
+def main():
+    with ProcessPoolExecutor(max_workers=len(files)) as executor:
+        for report in executor.map(analyze_excel_file, files.values(), files.keys()):
+            sys.stdout.write(report)
+
+    sys.stdout.write(f"\n{'='*80}\nANALYSIS COMPLETE\n{'='*80}\n")
+
 
-print("\n" + "="*80)
-print("ANALYSIS COMPLETE")
-print("="*80)
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,50 @@
 #!/usr/bin/env python3
+import io
+import math
+import mmap
 import openpyxl
 from openpyxl import load_workbook
 import os
+import re
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+CATEGORY_PATTERNS = {
+    'article': re.compile(r'art|item|artikel|material', re.I),
+    'project': re.compile(r'proj|project|auftrag', re.I),
+    'quantity': re.compile(r'qty|quantity|menge|anzahl|rem', re.I),
+    'date': re.compile(r'date|datum|termin', re.I),
+    'status': re.compile(r'status|state|zustand', re.I),
+}
+
+# QuantityRem1 sampling stops early once the share of rows with QuantityRem1 > 0
+# is known well enough: checked every QTY_CHECK_EVERY rows, it needs at least
+# QTY_MIN_EACH zero and non-zero rows and a 95% Wilson half-width below
+# QTY_MAX_HALF_WIDTH. The first 1000 rows remain the upper bound.
+QTY_CHECK_EVERY = 50
+QTY_MIN_EACH = 30
+QTY_MAX_HALF_WIDTH = 0.02
+
+
+def wilson_half_width(successes, n, z=1.96):
+    """Half-width of the Wilson score interval for successes out of n"""
+    p = successes / n
+    return z / (1 + z * z / n) * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+
+
+class _ReadOnlyMap(mmap.mmap):
+    """mmap that reports itself seekable, which zipfile checks (mmap only has seekable() from Python 3.13)"""
+
+    def seekable(self):
+        return True
+
+
+def map_file(filepath):
+    """Map a file read-only into memory so openpyxl reads it from the page cache"""
+    with open(filepath, 'rb') as f:
+        return _ReadOnlyMap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
 
 # File paths
 files = {
@@ -11,108 +54,137 @@ files = {
 }
 
 def analyze_excel_file(filepath, name):
-    print(f"\n{'='*80}")
-    print(f"FILE: {name}")
-    print(f"Path: {filepath}")
-    print('='*80)
+    """Analyze one workbook with openpyxl alone and return the report as a string"""
+    out = io.StringIO()
+    print(f"\n{'='*80}", file=out)
+    print(f"FILE: {name}", file=out)
+    print(f"Path: {filepath}", file=out)
+    print('='*80, file=out)
 
     try:
         # Check if file exists
         if not os.path.exists(filepath):
-            print(f"ERROR: File does not exist!")
-            return
-
-        # Load workbook
-        wb = load_workbook(filepath, read_only=True, data_only=True)
-
-        # Get the active sheet (or first sheet)
-        sheet = wb.active
-        print(f"\nActive sheet name: {sheet.title}")
-        print(f"Total rows: {sheet.max_row}")
-        print(f"Total columns: {sheet.max_column}")
-
-        # Get column names from first row
-        column_names = []
-        for col in range(1, sheet.max_column + 1):
-            cell_value = sheet.cell(row=1, column=col).value
-            column_names.append(cell_value if cell_value is not None else f"Column_{col}")
-
-        # Display all column names
-        print("\nALL COLUMN NAMES:")
-        for i, col in enumerate(column_names, 1):
-            print(f"  {i}. {col}")
-
-        # Display first 5 data rows (rows 2-6)
-        print("\nFIRST 5 DATA ROWS (SAMPLE):")
-        max_rows_to_show = min(6, sheet.max_row)
-        for row in range(2, max_rows_to_show + 1):
-            print(f"\n  Row {row-1}:")
-            for col_idx, col_name in enumerate(column_names, 1):
-                cell_value = sheet.cell(row=row, column=col_idx).value
-                if cell_value is not None:
-                    # Truncate long values
-                    value_str = str(cell_value)
-                    if len(value_str) > 50:
-                        value_str = value_str[:50] + "..."
-                    print(f"    {col_name}: {value_str}")
-
-        # Column analysis
-        print("\n\nCOLUMN ANALYSIS:")
-
-        # Look for Article Number columns
-        article_candidates = [col for col in column_names if col and any(x in str(col).lower() for x in ['art', 'item', 'artikel', 'material'])]
-        if article_candidates:
-            print(f"  Potential Article Number columns: {article_candidates}")
-
-        # Look for Project Number columns
-        project_candidates = [col for col in column_names if col and any(x in str(col).lower() for x in ['proj', 'project', 'auftrag'])]
-        if project_candidates:
-            print(f"  Potential Project Number columns: {project_candidates}")
-
-        # Look for quantity columns
-        qty_candidates = [col for col in column_names if col and any(x in str(col).lower() for x in ['qty', 'quantity', 'menge', 'anzahl', 'rem'])]
-        if qty_candidates:
-            print(f"  Potential Quantity columns: {qty_candidates}")
-
-        # Look for date columns
-        date_candidates = [col for col in column_names if col and any(x in str(col).lower() for x in ['date', 'datum', 'termin'])]
-        if date_candidates:
-            print(f"  Potential Date columns: {date_candidates}")
-
-        # Look for status columns
-        status_candidates = [col for col in column_names if col and any(x in str(col).lower() for x in ['status', 'state', 'zustand'])]
-        if status_candidates:
-            print(f"  Potential Status columns: {status_candidates}")
-
-        # Special check for QuantityRem1
-        if 'QuantityRem1' in column_names:
-            qty_rem_col = column_names.index('QuantityRem1') + 1
-            zero_count = 0
-            non_zero_count = 0
-
-            for row in range(2, min(1000, sheet.max_row + 1)):  # Check first 1000 rows
-                cell_value = sheet.cell(row=row, column=qty_rem_col).value
-                if cell_value == 0:
-                    zero_count += 1
-                elif cell_value and cell_value > 0:
-                    non_zero_count += 1
-
-            print(f"\n  *** IMPORTANT: Found 'QuantityRem1' column ***")
-            print(f"      - Rows where QuantityRem1 = 0 (sampled): {zero_count}")
-            print(f"      - Rows where QuantityRem1 > 0 (sampled): {non_zero_count}")
-            print(f"      - Rule: Rows with QuantityRem1 = 0 should be skipped (already delivered)")
-
-        wb.close()
-
+            print(f"ERROR: File does not exist!", file=out)
+            return out.getvalue()
+
+        # Load workbook from a read-only memory map of the file; both are
+        # closed even when the analysis below fails
+        with map_file(filepath) as buf:
+            wb = load_workbook(buf, read_only=True, data_only=True)
+            try:
+                # Get the active sheet (or first sheet)
+                sheet = wb.active
+                # Dimensions are looked up once; each access is not free in read-only mode
+                max_row = sheet.max_row
+                max_col = sheet.max_column
+                print(f"\nActive sheet name: {sheet.title}", file=out)
+                print(f"Total rows: {max_row}", file=out)
+                print(f"Total columns: {max_col}", file=out)
+
+                # Get column names from first row
+                header = next(sheet.iter_rows(min_row=1, max_row=1, max_col=max_col, values_only=True), ())
+                column_names = [value if value is not None else f"Column_{col}"
+                                for col, value in enumerate(header, 1)]
+
+                # Display all column names
+                print("\nALL COLUMN NAMES:", file=out)
+                out.write("".join(f"  {i}. {col}\n" for i, col in enumerate(column_names, 1)))
+
+                # Display first 5 data rows (rows 2-6)
+                print("\nFIRST 5 DATA ROWS (SAMPLE):", file=out)
+                max_rows_to_show = min(6, max_row)
+                sample_rows = sheet.iter_rows(min_row=2, max_row=max_rows_to_show, max_col=max_col,
+                                              values_only=True)
+                for row_num, row in enumerate(sample_rows, 1):
+                    print(f"\n  Row {row_num}:", file=out)
+                    for col_name, cell_value in zip(column_names, row):
+                        if cell_value is not None:
+                            # Truncate long values
+                            value_str = str(cell_value)
+                            if len(value_str) > 50:
+                                value_str = value_str[:50] + "..."
+                            print(f"    {col_name}: {value_str}", file=out)
+
+                # Column analysis
+                print("\n\nCOLUMN ANALYSIS:", file=out)
+
+                # Stringify the non-empty column names once instead of once per category
+                named_columns = [(col, str(col)) for col in column_names if col]
+
+                # Look for Article Number columns
+                article_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['article'].search(text)]
+                if article_candidates:
+                    print(f"  Potential Article Number columns: {article_candidates}", file=out)
+
+                # Look for Project Number columns
+                project_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['project'].search(text)]
+                if project_candidates:
+                    print(f"  Potential Project Number columns: {project_candidates}", file=out)
+
+                # Look for quantity columns
+                qty_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['quantity'].search(text)]
+                if qty_candidates:
+                    print(f"  Potential Quantity columns: {qty_candidates}", file=out)
+
+                # Look for date columns
+                date_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['date'].search(text)]
+                if date_candidates:
+                    print(f"  Potential Date columns: {date_candidates}", file=out)
+
+                # Look for status columns
+                status_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['status'].search(text)]
+                if status_candidates:
+                    print(f"  Potential Status columns: {status_candidates}", file=out)
+
+                # Special check for QuantityRem1
+                if 'QuantityRem1' in column_names:
+                    qty_rem_col = column_names.index('QuantityRem1') + 1
+                    zero_count = 0
+                    non_zero_count = 0
+
+                    # Check up to the first 1000 rows, streaming only the QuantityRem1 column
+                    qty_rows = sheet.iter_rows(min_row=2, max_row=min(999, max_row),
+                                               min_col=qty_rem_col, max_col=qty_rem_col,
+                                               values_only=True)
+                    sampled_rows = 0
+                    for (cell_value,) in qty_rows:
+                        sampled_rows += 1
+                        if cell_value == 0:
+                            zero_count += 1
+                        elif cell_value and cell_value > 0:
+                            non_zero_count += 1
+                        if (sampled_rows % QTY_CHECK_EVERY == 0
+                                and min(zero_count, non_zero_count) >= QTY_MIN_EACH
+                                and wilson_half_width(non_zero_count, zero_count + non_zero_count)
+                                < QTY_MAX_HALF_WIDTH):
+                            break
+
+                    print(f"\n  *** IMPORTANT: Found 'QuantityRem1' column ***", file=out)
+                    print(f"      - Rows sampled: {sampled_rows}", file=out)
+                    print(f"      - Rows where QuantityRem1 = 0 (sampled): {zero_count}", file=out)
+                    print(f"      - Rows where QuantityRem1 > 0 (sampled): {non_zero_count}", file=out)
+                    print(f"      - Rule: Rows with QuantityRem1 = 0 should be skipped (already delivered)", file=out)
+            finally:
+                wb.close()
+
+    except OSError as e:
+        # Missing or unreadable file: the message says it all, no stack needed
+        print(f"\nERROR reading file: {str(e)}", file=out)
     except Exception as e:
-        print(f"\nERROR reading file: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        print(f"\nERROR reading file: {str(e)}", file=out)
+        traceback.print_exc(file=out)
+
+    return out.getvalue()
+
+
+def main():
+    # One worker per workbook; executor.map keeps the reports in file order
+    with ProcessPoolExecutor(max_workers=len(files)) as executor:
+        for report in executor.map(analyze_excel_file, files.values(), files.keys()):
+            sys.stdout.write(report)
+
+    sys.stdout.write(f"\n{'='*80}\nANALYSIS COMPLETE\n{'='*80}\n")
 
-# Analyze all files
-for name, filepath in files.items():
-    analyze_excel_file(filepath, name)
 
-print("\n" + "="*80)
-print("ANALYSIS COMPLETE")
-print("="*80)
+if __name__ == "__main__":
+    main()
@@ -4,30 +4,66 @@ Excel File Analyzer for ERP Data
 Analyzes three Excel files and extracts column structure and sample data
 """
 
+import hashlib
+import io
 import sys
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
 # Try to import required libraries
 try:
+    import numpy as np
     import pandas as pd
+    from pandas.io.parsers import TextParser
     use_pandas = True
-    print("Using pandas for analysis")
 except ImportError:
     use_pandas = False
-    print("Pandas not available, trying openpyxl...")
 
-if not use_pandas:
-    try:
-        from openpyxl import load_workbook
-        use_openpyxl = True
-        print("Using openpyxl for analysis")
-    except ImportError:
+# openpyxl is needed in both modes: pandas reads its sheets through it too
+try:
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import ERROR_CODES
+    use_openpyxl = True
+except ImportError:
+    if use_pandas:
+        print("ERROR: openpyxl is required to read the Excel files!")
+    else:
         print("ERROR: Neither pandas nor openpyxl is available!")
-        print("Please install one of them:")
-        print("  pip install pandas openpyxl")
-        print("  or")
-        print("  pip install openpyxl")
-        sys.exit(1)
+    print("Please install one of them:")
+    print("  pip install pandas openpyxl")
+    print("  or")
+    print("  pip install openpyxl")
+    sys.exit(1)
+
+# python-calamine (pip install python-calamine) lets pandas parse xlsx/xlsm in
+# Rust; without it sheets are streamed through openpyxl's read-only mode
+try:
+    import python_calamine  # noqa: F401
+    engine = 'calamine'
+except ImportError:
+    engine = 'openpyxl'
+
+# Keyword patterns used to spot candidate columns (matched case-insensitively)
+CATEGORY_PATTERNS = {
+    'article': re.compile(r'art|item|artikel|material|nummer', re.I),
+    'project': re.compile(r'proj|project|auftrag|order', re.I),
+    'quantity': re.compile(r'qty|quantity|menge|anzahl|rem', re.I),
+    'date': re.compile(r'date|datum|termin|deadline', re.I),
+    'status': re.compile(r'status|state|zustand', re.I),
+}
+
+# Files larger than this are analyzed with the streaming openpyxl reader even
+# when pandas is available, so no full DataFrame has to fit into memory
+STREAMING_MIN_SIZE = 50 * 1024 * 1024
+
+# Structured results written next to the printed report (pandas mode only);
+# without a Parquet engine (pyarrow/fastparquet) CSV files are written instead
+SUMMARY_PATH = 'analysis_summary.parquet'
+PREVIEW_PATH = 'analysis_preview.parquet'
+SUMMARY_COLUMNS = ['file', 'column', 'category', 'sample', 'nunique', 'min', 'max', 'mean']
+PREVIEW_COLUMNS = ['file', 'row', 'column', 'value']
 
 # File paths
 FILES = {
@@ -36,248 +72,626 @@ FILES = {
     'Project Management (Controlling)': '/Users/phillipplomer/Desktop/Programme/Neubau Claude/Controlling.xlsx'
 }
 
+# Parsed sheets, reused while a workbook's mtime and size are unchanged
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'neubau')
+
+# Part of every cache key; bump it when a change alters the parsed sheets so
+# entries written by older code are not served any more
+CACHE_VERSION = 2
+
+
+def _digest(text):
+    """Short stable hash used in cache file names"""
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def _cache_path(filepath, nrows, usecols, dtype):
+    """Cache file for one read of the current version of filepath
+
+    Named 'sheet-<file>-<version>-<read>.pkl': all entries of one workbook
+    share <file>, and <version> changes with its mtime, size, the engine
+    and CACHE_VERSION, so _store_cached can find and drop outdated entries.
+    """
+    st = os.stat(filepath)
+    file_key = _digest(os.path.abspath(filepath))
+    version_key = _digest(f"{st.st_mtime_ns}:{st.st_size}:{engine}:{CACHE_VERSION}")
+    read_key = _digest(f"{nrows}:{usecols!r}:{dtype!r}")
+    return os.path.join(CACHE_DIR, f"sheet-{file_key}-{version_key}-{read_key}.pkl")
+
+
+def _load_cached(cache_path):
+    """Return the DataFrame cached at cache_path, or None"""
+    try:
+        return pd.read_pickle(cache_path)
+    except Exception:
+        return None  # missing or unreadable cache entry
+
+
+def _store_cached(cache_path, df):
+    """Cache df at cache_path; best effort, failures are ignored
+
+    Entries of the same workbook written for an older version of it are
+    deleted, so the cache holds at most one version per file.
+    """
+    # Write to a temp file first so an interrupted run never leaves a partial entry
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        return
+
+    file_prefix, version_key = os.path.basename(cache_path).rsplit('-', 2)[:2]
+    for entry in os.listdir(CACHE_DIR):
+        if entry.startswith(f"{file_prefix}-") and not entry.startswith(f"{file_prefix}-{version_key}-"):
+            try:
+                os.remove(os.path.join(CACHE_DIR, entry))
+            except OSError:
+                pass  # already removed by another run
+
+
+def read_sheet(filepath, nrows=None, usecols=None, dtype=None):
+    """Read the first sheet into a DataFrame, cached on disk
+
+    An unchanged file is loaded from a pickle in CACHE_DIR instead of being
+    parsed again; see parse_sheet for the arguments.
+    """
+    cache_path = _cache_path(filepath, nrows, usecols, dtype)
+    df = _load_cached(cache_path)
+    if df is None:
+        df = parse_sheet(filepath, nrows=nrows, usecols=usecols, dtype=dtype)
+        _store_cached(cache_path, df)
+    return df
+
+
+def read_head_and_columns(filepath, nrows, choose):
+    """Read the first nrows rows, then all rows of the columns chosen from them
+
+    choose(head_df) returns the (usecols, dtype) of the full read. Returns
+    (head_df, df); both are cached like read_sheet. On the openpyxl path the
+    workbook is opened and its rows streamed only once for both results.
+    """
+    head_path = _cache_path(filepath, nrows, None, None)
+    head_df = _load_cached(head_path)
+    if head_df is not None or engine == 'calamine':
+        if head_df is None:
+            head_df = read_sheet(filepath, nrows=nrows)
+        usecols, dtype = choose(head_df)
+        return head_df, read_sheet(filepath, usecols=usecols, dtype=dtype)
+
+    wb = load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = _sheet_rows(wb.worksheets[0])
+        first = list(islice(rows, nrows + 1))
+        head_df = _parse_rows(_drop_trailing_empty(first), header=0, nrows=nrows)
+        usecols, dtype = choose(head_df)
+        # Only the chosen cells of the remaining rows are handed to the parser;
+        # the names come from the header probe, so no header row is needed
+        if all(isinstance(col, int) for col in usecols):
+            keep = [i for i in usecols if i < len(head_df.columns)]
+        else:
+            keep = [i for i, col in enumerate(head_df.columns) if col in usecols]
+        selected = ([row[i] if i < len(row) else '' for i in keep]
+                    for row in _drop_trailing_empty(chain(first[1:], rows)))
+        df = _parse_rows(selected, names=[head_df.columns[i] for i in keep], header=None,
+                         dtype=dtype)
+    finally:
+        wb.close()
+
+    _store_cached(head_path, head_df)
+    _store_cached(_cache_path(filepath, None, usecols, dtype), df)
+    return head_df, df
+
+
+def parse_sheet(filepath, nrows=None, usecols=None, dtype=None):
+    """Parse the first sheet into a DataFrame
+
+    nrows limits the number of data rows, usecols restricts the result to the
+    given column names or positions and dtype is applied as in pd.read_excel.
+    Uses the calamine engine when available. Otherwise cell values are
+    streamed from openpyxl's read-only mode without building a cell object
+    per value, and handed to the same TextParser pd.read_excel uses, so
+    header names, NA values and number conversion come out the same.
+    """
+    if engine == 'calamine':
+        return pd.read_excel(filepath, engine='calamine', nrows=nrows, usecols=usecols,
+                             dtype=dtype)
+
+    wb = load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = _sheet_rows(wb.worksheets[0])
+        if nrows is not None:
+            rows = islice(rows, nrows + 1)
+        return _parse_rows(_drop_trailing_empty(rows), header=0, nrows=nrows, usecols=usecols,
+                           dtype=dtype)
+    finally:
+        wb.close()
+
+
+def _cell_value(value):
+    """Convert one openpyxl value the way pandas' openpyxl reader does"""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return int(value) if value == int(value) else value
+    if isinstance(value, str) and value in ERROR_CODES:
+        return float('nan')  # error cells such as #DIV/0! are missing values
+    return value
+
+
+def _sheet_rows(sheet):
+    """Yield the rows of a read-only sheet as lists of converted cell values
+
+    The stored <dimension> is ignored since it may be stale or missing, so
+    rows have their own length; trailing empty cells are cut off as in
+    pandas' openpyxl reader.
+    """
+    sheet.reset_dimensions()
+    for row in sheet.iter_rows(values_only=True):
+        row = [_cell_value(value) for value in row]
+        while row and row[-1] == '':
+            row.pop()
+        yield row
+
+
+def _drop_trailing_empty(rows):
+    """Yield rows, leaving out the empty rows at the end of the sheet
+
+    Empty rows are held back until a non-empty row follows, so the stream
+    never buffers more than one run of blank rows.
+    """
+    pending = []
+    for row in rows:
+        if all(value is None or value == '' for value in row):
+            pending.append(row)
+            continue
+        if pending:
+            yield from pending
+            pending.clear()
+        yield row
+
+
+def _parse_rows(rows, names=None, nrows=None, **kwargs):
+    """Parse row lists into a DataFrame like pd.read_excel
+
+    Rows are padded to a common width, then parsed by TextParser with the
+    options pd.read_excel passes; kwargs (header, usecols, dtype) are passed on.
+    """
+    rows = list(rows)
+    if not rows:
+        return pd.DataFrame(columns=names)
+    width = max(len(row) for row in rows)
+    for row in rows:
+        row.extend([''] * (width - len(row)))
+    return TextParser(rows, names=names, nrows=nrows, skip_blank_lines=False, **kwargs).read(nrows)
+
+
+def classify_columns(columns):
+    """Map each CATEGORY_PATTERNS category to its candidate columns
+
+    Each name is stringified once and tested with one regex per category.
+    """
+    named_columns = [(col, str(col)) for col in columns]
+    return {category: [col for col, text in named_columns if pattern.search(text)]
+            for category, pattern in CATEGORY_PATTERNS.items()}
+
+
+def analysis_columns(head_df):
+    """Choose the (usecols, dtype) of the full read from the sample rows"""
+    candidates = classify_columns(head_df.columns)
+    usecols = list(dict.fromkeys(col for cols in candidates.values() for col in cols))
+    if 'QuantityRem1' in head_df.columns and 'QuantityRem1' not in usecols:
+        usecols.append('QuantityRem1')
+    # Article and project numbers are identifiers: read them as text and
+    # skip type inference, unless a column also has to be numeric or a date
+    numeric_or_date = set(candidates['quantity']) | set(candidates['date']) | {'QuantityRem1'}
+    dtype = {col: str for col in candidates['article'] + candidates['project']
+             if col not in numeric_or_date}
+    # Keep at least the first column (by position, since its name may be a
+    # generated 'Unnamed: 0') so the data rows are still counted
+    return usecols or [0], dtype or None
+
+
+def summary_row(name, col, category, sample=None, nunique=None, col_min=None, col_max=None,
+                col_mean=None):
+    """One SUMMARY_COLUMNS record; values are normalized so every file stacks into one table"""
+    return {
+        'file': name,
+        'column': str(col),
+        'category': category,
+        'sample': None if sample is None else str(sample),
+        'nunique': nunique,
+        'min': None if col_min is None else float(col_min),
+        'max': None if col_max is None else float(col_max),
+        'mean': None if col_mean is None else float(col_mean),
+    }
+
+
+def write_table(rows, columns, path):
+    """Write rows as Parquet, or as CSV next to path without a Parquet engine
+
+    Returns the path actually written.
+    """
+    df = pd.DataFrame(rows, columns=columns)
+    try:
+        df.to_parquet(path, index=False)
+    except ImportError:
+        path = os.path.splitext(path)[0] + '.csv'
+        df.to_csv(path, index=False)
+    return path
+
+
+def format_sample_column(series):
+    """Format the cells of one sample column for display, None for missing ones
+
+    Floats are shown without decimals when they are whole numbers and with
+    two decimals otherwise. Float columns are formatted in one vectorized
+    pass; other columns are formatted cell by cell with the same rule.
+    """
+    missing = series.isna().to_numpy()
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = np.where(missing, 0.0, series.to_numpy(dtype=np.float64, na_value=np.nan))
+        text = np.where(values == np.trunc(values),
+                        np.char.mod('%d', values), np.char.mod('%.2f', values)).tolist()
+        return [None if is_missing else value_str for is_missing, value_str in zip(missing, text)]
+
+    # Missing cells are skipped before formatting; int(nan) would raise
+    return [None if is_missing
+            else f"{value:.2f}" if isinstance(value, float) and value != int(value)
+            else f"{int(value)}" if isinstance(value, float)
+            else str(value)
+            for is_missing, value in zip(missing, series)]
+
+
+def first_valid_value(series):
+    """Return the first non-null value of series, or "N/A" if there is none
+
+    Stops at the first valid entry instead of building a dropna() copy.
+    """
+    idx = series.first_valid_index()
+    return series.at[idx] if idx is not None else "N/A"
+
+
+def print_recommendations(out, article_candidates, project_candidates):
+    """Print the RECOMMENDATIONS section; it only needs the header names"""
+    print(f"\n\nRECOMMENDATIONS:", file=out)
+    print("-" * 100, file=out)
+
+    if article_candidates:
+        print(f"  ARTIKELNUMMER (Article Number): Use column '{article_candidates[0]}'", file=out)
+    else:
+        print(f"  ARTIKELNUMMER (Article Number): Not clearly identified - manual review needed", file=out)
+
+    if project_candidates:
+        print(f"  PROJEKTNUMMER (Project Number): Use column '{project_candidates[0]}'", file=out)
+    else:
+        print(f"  PROJEKTNUMMER (Project Number): Not clearly identified - manual review needed", file=out)
+
 
 def analyze_with_pandas(filepath, name):
-    """Analyze Excel file using pandas"""
-    print(f"\n{'='*100}")
-    print(f"FILE: {name}")
-    print(f"Path: {filepath}")
-    print('='*100)
+    """Analyze Excel file using pandas
+
+    Returns (report, summary, preview): the printed report as a string plus
+    SUMMARY_COLUMNS and PREVIEW_COLUMNS records for the structured output.
+    """
+    out = io.StringIO()
+    summary = []
+    preview = []
+    print(f"\n{'='*100}", file=out)
+    print(f"FILE: {name}", file=out)
+    print(f"Path: {filepath}", file=out)
+    print('='*100, file=out)
 
     try:
-        # Read Excel file
-        df = pd.read_excel(filepath, engine='openpyxl')
+        # The header and sample rows come from a short read; the full read
+        # only materializes the columns analyzed below
+        head_df, df = read_head_and_columns(filepath, 5, analysis_columns)
+
+        candidates = classify_columns(head_df.columns)
+        article_candidates = candidates['article']
+        project_candidates = candidates['project']
+        qty_candidates = candidates['quantity']
+        date_candidates = candidates['date']
+        status_candidates = candidates['status']
 
         # Basic information
-        print(f"\nBASIC INFORMATION:")
-        print(f"  Total rows (including header): {len(df) + 1}")
-        print(f"  Data rows: {len(df)}")
-        print(f"  Total columns: {len(df.columns)}")
+        print(f"\nBASIC INFORMATION:", file=out)
+        print(f"  Total rows (including header): {len(df) + 1}", file=out)
+        print(f"  Data rows: {len(df)}", file=out)
+        print(f"  Total columns: {len(head_df.columns)}", file=out)
 
         # All column names
-        print(f"\nALL COLUMN NAMES ({len(df.columns)} columns):")
-        for i, col in enumerate(df.columns, 1):
-            print(f"  {i:2d}. {col}")
+        print(f"\nALL COLUMN NAMES ({len(head_df.columns)} columns):", file=out)
+        for i, col in enumerate(head_df.columns, 1):
+            print(f"  {i:2d}. {col}", file=out)
 
         # Sample data - first 5 rows
-        print(f"\nSAMPLE DATA (First 5 rows):")
-        print("-" * 100)
-
-        # Show data in a readable format
-        for idx in range(min(5, len(df))):
-            print(f"\nRow {idx + 1}:")
-            for col in df.columns:
-                value = df.iloc[idx][col]
-                if pd.notna(value):  # Only show non-null values
-                    # Format value
-                    if isinstance(value, float):
-                        value_str = f"{value:.2f}" if value != int(value) else f"{int(value)}"
-                    else:
-                        value_str = str(value)
+        print(f"\nSAMPLE DATA (First 5 rows):", file=out)
+        print("-" * 100, file=out)
+
+        # Show data in a readable format; cells are formatted column by column
+        formatted = [format_sample_column(head_df.iloc[:, i]) for i in range(len(head_df.columns))]
+        for row_num, row in enumerate(zip(*formatted), 1):
+            print(f"\nRow {row_num}:", file=out)
+            for col, value_str in zip(head_df.columns, row):
+                if value_str is not None:  # Only show non-null values
+                    preview.append({'file': name, 'row': row_num, 'column': str(col), 'value': value_str})
 
                     # Truncate long values
                     if len(value_str) > 60:
                         value_str = value_str[:60] + "..."
 
-                    print(f"  {col}: {value_str}")
+                    print(f"  {col}: {value_str}", file=out)
 
         # Column Analysis
-        print(f"\n\nCOLUMN ANALYSIS:")
-        print("-" * 100)
+        print(f"\n\nCOLUMN ANALYSIS:", file=out)
+        print("-" * 100, file=out)
 
         # Article Number columns
-        article_candidates = [col for col in df.columns
-                            if any(x in str(col).lower() for x in ['art', 'item', 'artikel', 'material', 'nummer'])]
         if article_candidates:
-            print(f"\nPotential ARTICLE NUMBER columns:")
+            print(f"\nPotential ARTICLE NUMBER columns:", file=out)
             for col in article_candidates:
-                sample_val = df[col].dropna().iloc[0] if len(df[col].dropna()) > 0 else "N/A"
-                print(f"  - {col}")
-                print(f"    Sample value: {sample_val}")
-                print(f"    Unique values: {df[col].nunique()}")
+                sample_val = first_valid_value(df[col])
+                unique_count = df[col].nunique()
+                print(f"  - {col}", file=out)
+                print(f"    Sample value: {sample_val}", file=out)
+                print(f"    Unique values: {unique_count}", file=out)
+                summary.append(summary_row(name, col, 'article', sample=sample_val, nunique=unique_count))
 
         # Project Number columns
-        project_candidates = [col for col in df.columns
-                            if any(x in str(col).lower() for x in ['proj', 'project', 'auftrag', 'order'])]
         if project_candidates:
-            print(f"\nPotential PROJECT NUMBER columns:")
+            print(f"\nPotential PROJECT NUMBER columns:", file=out)
             for col in project_candidates:
-                sample_val = df[col].dropna().iloc[0] if len(df[col].dropna()) > 0 else "N/A"
-                print(f"  - {col}")
-                print(f"    Sample value: {sample_val}")
-                print(f"    Unique values: {df[col].nunique()}")
+                sample_val = first_valid_value(df[col])
+                unique_count = df[col].nunique()
+                print(f"  - {col}", file=out)
+                print(f"    Sample value: {sample_val}", file=out)
+                print(f"    Unique values: {unique_count}", file=out)
+                summary.append(summary_row(name, col, 'project', sample=sample_val, nunique=unique_count))
 
         # Quantity columns
-        qty_candidates = [col for col in df.columns
-                        if any(x in str(col).lower() for x in ['qty', 'quantity', 'menge', 'anzahl', 'rem'])]
         if qty_candidates:
-            print(f"\nPotential QUANTITY columns:")
+            print(f"\nPotential QUANTITY columns:", file=out)
+            # Dtypes are snapshotted once and checked directly, not via each column Series
+            dtypes = df.dtypes
             for col in qty_candidates:
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    print(f"  - {col}")
-                    print(f"    Min: {df[col].min()}, Max: {df[col].max()}, Mean: {df[col].mean():.2f}")
+                if pd.api.types.is_numeric_dtype(dtypes[col]):
+                    # Separate reductions keep min/max in the column's own type
+                    # (agg() would upcast them to float in one result Series)
+                    series = df[col]
+                    col_min, col_max, col_mean = series.min(), series.max(), series.mean()
+                    print(f"  - {col}", file=out)
+                    print(f"    Min: {col_min}, Max: {col_max}, Mean: {col_mean:.2f}", file=out)
+                    summary.append(summary_row(name, col, 'quantity', col_min=col_min, col_max=col_max,
+                                               col_mean=col_mean))
 
         # Date columns
-        date_candidates = [col for col in df.columns
-                         if any(x in str(col).lower() for x in ['date', 'datum', 'termin', 'deadline'])]
         if date_candidates:
-            print(f"\nPotential DATE columns:")
+            print(f"\nPotential DATE columns:", file=out)
             for col in date_candidates:
-                sample_val = df[col].dropna().iloc[0] if len(df[col].dropna()) > 0 else "N/A"
-                print(f"  - {col}")
-                print(f"    Sample value: {sample_val}")
+                sample_val = first_valid_value(df[col])
+                print(f"  - {col}", file=out)
+                print(f"    Sample value: {sample_val}", file=out)
+                summary.append(summary_row(name, col, 'date', sample=sample_val))
 
         # Status columns
-        status_candidates = [col for col in df.columns
-                           if any(x in str(col).lower() for x in ['status', 'state', 'zustand'])]
         if status_candidates:
-            print(f"\nPotential STATUS columns:")
+            print(f"\nPotential STATUS columns:", file=out)
             for col in status_candidates:
                 unique_vals = df[col].unique()[:5]  # First 5 unique values
-                print(f"  - {col}")
-                print(f"    Unique values (first 5): {unique_vals}")
+                print(f"  - {col}", file=out)
+                print(f"    Unique values (first 5): {unique_vals}", file=out)
+                summary.append(summary_row(name, col, 'status', sample=list(unique_vals)))
 
         # Special handling for Sales file
         if 'QuantityRem1' in df.columns:
-            print(f"\n{'*'*100}")
-            print(f"IMPORTANT: QuantityRem1 column found (BUSINESS RULE)")
-            print(f"{'*'*100}")
-            zero_count = len(df[df['QuantityRem1'] == 0])
-            non_zero_count = len(df[df['QuantityRem1'] > 0])
-            total = len(df)
-            print(f"  Total rows: {total}")
-            print(f"  Rows where QuantityRem1 = 0 (already delivered, SKIP): {zero_count} ({zero_count/total*100:.1f}%)")
-            print(f"  Rows where QuantityRem1 > 0 (pending delivery, INCLUDE): {non_zero_count} ({non_zero_count/total*100:.1f}%)")
-            print(f"\n  ACTION: Filter out rows where QuantityRem1 == 0 before processing")
+            print(f"\n{'*'*100}", file=out)
+            print(f"IMPORTANT: QuantityRem1 column found (BUSINESS RULE)", file=out)
+            print(f"{'*'*100}", file=out)
+            # One float array, two count_nonzero reductions; non-numeric cells
+            # become NaN, which neither == 0 nor > 0 matches
+            qty = pd.to_numeric(df['QuantityRem1'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            zero_count = int(np.count_nonzero(qty == 0))
+            non_zero_count = int(np.count_nonzero(qty > 0))
+            total = qty.size
+            print(f"  Total rows: {total}", file=out)
+            print(f"  Rows where QuantityRem1 = 0 (already delivered, SKIP): {zero_count} ({zero_count/total*100:.1f}%)", file=out)
+            print(f"  Rows where QuantityRem1 > 0 (pending delivery, INCLUDE): {non_zero_count} ({non_zero_count/total*100:.1f}%)", file=out)
+            print(f"\n  ACTION: Filter out rows where QuantityRem1 == 0 before processing", file=out)
 
         # Recommendations
-        print(f"\n\nRECOMMENDATIONS:")
-        print("-" * 100)
-
-        if article_candidates:
-            print(f"  ARTIKELNUMMER (Article Number): Use column '{article_candidates[0]}'")
-        else:
-            print(f"  ARTIKELNUMMER (Article Number): Not clearly identified - manual review needed")
-
-        if project_candidates:
-            print(f"  PROJEKTNUMMER (Project Number): Use column '{project_candidates[0]}'")
-        else:
-            print(f"  PROJEKTNUMMER (Project Number): Not clearly identified - manual review needed")
+        print_recommendations(out, article_candidates, project_candidates)
 
     except Exception as e:
-        print(f"\nERROR analyzing file: {str(e)}")
+        print(f"\nERROR analyzing file: {str(e)}", file=out)
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=out)
+
+    return out.getvalue(), summary, preview
 
 
-def analyze_with_openpyxl(filepath, name):
-    """Analyze Excel file using openpyxl (fallback method)"""
-    print(f"\n{'='*100}")
-    print(f"FILE: {name}")
-    print(f"Path: {filepath}")
-    print('='*100)
+def analyze_with_openpyxl(filepath, name, large_file=False):
+    """Analyze Excel file using openpyxl (fallback method)
+
+    Also used for files above STREAMING_MIN_SIZE (large_file=True), since it
+    streams the sheet instead of building a DataFrame. Returns (report,
+    summary, preview) like analyze_with_pandas; the summary only names the
+    candidate columns, without statistics.
+    """
+    out = io.StringIO()
+    summary = []
+    preview = []
+    print(f"\n{'='*100}", file=out)
+    print(f"FILE: {name}", file=out)
+    print(f"Path: {filepath}", file=out)
+    print('='*100, file=out)
 
     try:
         # Load workbook
         wb = load_workbook(filepath, read_only=True, data_only=True)
         sheet = wb.active
 
-        print(f"\nBASIC INFORMATION:")
-        print(f"  Sheet name: {sheet.title}")
-        print(f"  Total rows: {sheet.max_row}")
-        print(f"  Total columns: {sheet.max_column}")
-
-        # Get column names
-        column_names = []
-        for col in range(1, sheet.max_column + 1):
-            cell_value = sheet.cell(row=1, column=col).value
-            column_names.append(cell_value if cell_value is not None else f"Column_{col}")
+        # The stored dimension may be stale or missing, so it is ignored and
+        # rows and columns are counted in one streaming pass, which also keeps
+        # the first 5 data rows and the QuantityRem1 counts; empty rows at the
+        # end are left out like in the pandas report
+        sheet.reset_dimensions()
+        rows = _drop_trailing_empty(sheet.iter_rows(values_only=True))
+        header = next(rows, ())
+        qty_index = header.index('QuantityRem1') if 'QuantityRem1' in header else None
+        max_col = len(header)
+        sample_rows = []
+        data_rows = zero_count = non_zero_count = 0
+        for row in rows:
+            data_rows += 1
+            max_col = max(max_col, len(row))
+            if data_rows <= 5:
+                sample_rows.append(row)
+            if qty_index is not None and qty_index < len(row):
+                cell_value = row[qty_index]
+                if isinstance(cell_value, (int, float)):
+                    if cell_value == 0:
+                        zero_count += 1
+                    elif cell_value > 0:
+                        non_zero_count += 1
+
+        print(f"\nBASIC INFORMATION:", file=out)
+        print(f"  Sheet name: {sheet.title}", file=out)
+        print(f"  Total rows: {data_rows + 1}", file=out)
+        print(f"  Total columns: {max_col}", file=out)
+
+        header += (None,) * (max_col - len(header))
+        column_names = [value if value is not None else f"Column_{col}"
+                        for col, value in enumerate(header, 1)]
 
         # Display column names
-        print(f"\nALL COLUMN NAMES ({len(column_names)} columns):")
+        print(f"\nALL COLUMN NAMES ({len(column_names)} columns):", file=out)
         for i, col in enumerate(column_names, 1):
-            print(f"  {i:2d}. {col}")
+            print(f"  {i:2d}. {col}", file=out)
 
         # Display sample data
-        print(f"\nSAMPLE DATA (First 5 rows):")
-        print("-" * 100)
-
-        max_rows = min(6, sheet.max_row)
-        for row in range(2, max_rows + 1):
-            print(f"\nRow {row - 1}:")
-            for col_idx, col_name in enumerate(column_names, 1):
-                cell_value = sheet.cell(row=row, column=col_idx).value
+        print(f"\nSAMPLE DATA (First 5 rows):", file=out)
+        print("-" * 100, file=out)
+
+        for row_num, row in enumerate(sample_rows, 1):
+            print(f"\nRow {row_num}:", file=out)
+            for col_name, cell_value in zip(column_names, row):
                 if cell_value is not None:
                     value_str = str(cell_value)
+                    preview.append({'file': name, 'row': row_num, 'column': str(col_name), 'value': value_str})
                     if len(value_str) > 60:
                         value_str = value_str[:60] + "..."
-                    print(f"  {col_name}: {value_str}")
+                    print(f"  {col_name}: {value_str}", file=out)
 
         # Column analysis
-        print(f"\n\nCOLUMN ANALYSIS:")
-        print("-" * 100)
-
-        article_candidates = [col for col in column_names
-                            if col and any(x in str(col).lower() for x in ['art', 'item', 'artikel', 'material'])]
-        project_candidates = [col for col in column_names
-                            if col and any(x in str(col).lower() for x in ['proj', 'project', 'auftrag'])]
-        qty_candidates = [col for col in column_names
-                        if col and any(x in str(col).lower() for x in ['qty', 'quantity', 'menge', 'anzahl', 'rem'])]
-        date_candidates = [col for col in column_names
-                         if col and any(x in str(col).lower() for x in ['date', 'datum', 'termin'])]
+        print(f"\n\nCOLUMN ANALYSIS:", file=out)
+        print("-" * 100, file=out)
+        if large_file:
+            print(f"\n  NOTE: File is larger than {STREAMING_MIN_SIZE // (1024 * 1024)} MiB and was streamed;", file=out)
+            print(f"  per-column samples, unique counts and min/max/mean are skipped.", file=out)
+
+        named_columns = [(col, str(col)) for col in column_names if col]
+        article_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['article'].search(text)]
+        project_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['project'].search(text)]
+        qty_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['quantity'].search(text)]
+        date_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['date'].search(text)]
+        status_candidates = [col for col, text in named_columns if CATEGORY_PATTERNS['status'].search(text)]
+        for category, cols in [('article', article_candidates), ('project', project_candidates),
+                               ('quantity', qty_candidates), ('date', date_candidates),
+                               ('status', status_candidates)]:
+            summary.extend(summary_row(name, col, category) for col in cols)
 
         if article_candidates:
-            print(f"\nPotential ARTICLE NUMBER columns: {article_candidates}")
+            print(f"\nPotential ARTICLE NUMBER columns: {article_candidates}", file=out)
         if project_candidates:
-            print(f"\nPotential PROJECT NUMBER columns: {project_candidates}")
+            print(f"\nPotential PROJECT NUMBER columns: {project_candidates}", file=out)
         if qty_candidates:
-            print(f"\nPotential QUANTITY columns: {qty_candidates}")
+            print(f"\nPotential QUANTITY columns: {qty_candidates}", file=out)
         if date_candidates:
-            print(f"\nPotential DATE columns: {date_candidates}")
+            print(f"\nPotential DATE columns: {date_candidates}", file=out)
+        if status_candidates:
+            print(f"\nPotential STATUS columns: {status_candidates}", file=out)
 
         # Check for QuantityRem1
         if 'QuantityRem1' in column_names:
-            print(f"\n{'*'*100}")
-            print(f"IMPORTANT: QuantityRem1 column found")
-            print(f"  BUSINESS RULE: Rows with QuantityRem1 = 0 should be skipped (already delivered)")
-            print(f"{'*'*100}")
+            print(f"\n{'*'*100}", file=out)
+            print(f"IMPORTANT: QuantityRem1 column found", file=out)
+            print(f"  BUSINESS RULE: Rows with QuantityRem1 = 0 should be skipped (already delivered)", file=out)
+            print(f"{'*'*100}", file=out)
+
+            total = data_rows
+            if total:
+                print(f"  Total rows: {total}", file=out)
+                print(f"  Rows where QuantityRem1 = 0 (already delivered, SKIP): {zero_count} ({zero_count/total*100:.1f}%)", file=out)
+                print(f"  Rows where QuantityRem1 > 0 (pending delivery, INCLUDE): {non_zero_count} ({non_zero_count/total*100:.1f}%)", file=out)
+
+        print_recommendations(out, article_candidates, project_candidates)
 
         wb.close()
 
     except Exception as e:
-        print(f"\nERROR analyzing file: {str(e)}")
+        print(f"\nERROR analyzing file: {str(e)}", file=out)
         import traceback
-        traceback.print_exc()
+        traceback.print_exc(file=out)
+
+    return out.getvalue(), summary, preview
 
 
 def main():
     """Main analysis function"""
-    print("="*100)
-    print("EXCEL FILE ANALYZER - ERP Data Analysis")
-    print("="*100)
-
-    # Check files exist
-    print("\nChecking files...")
-    for name, filepath in FILES.items():
-        exists = "EXISTS" if os.path.exists(filepath) else "NOT FOUND"
-        print(f"  {name}: {exists}")
-
-    print("\n")
-
-    # Analyze each file
+    out = io.StringIO()
+    print("Using pandas for analysis" if use_pandas else "Using openpyxl for analysis", file=out)
+    print("="*100, file=out)
+    print("EXCEL FILE ANALYZER - ERP Data Analysis", file=out)
+    print("="*100, file=out)
+
+    # Check files exist; each path is stat'ed once for the listing, the
+    # analysis and the choice of reader
+    print("\nChecking files...", file=out)
+    sizes = {}
     for name, filepath in FILES.items():
-        if not os.path.exists(filepath):
-            print(f"\nSKIPPING {name}: File not found")
-            continue
-
-        if use_pandas:
-            analyze_with_pandas(filepath, name)
-        else:
-            analyze_with_openpyxl(filepath, name)
-
-    print("\n" + "="*100)
-    print("ANALYSIS COMPLETE")
-    print("="*100)
+        try:
+            sizes[name] = os.stat(filepath).st_size
+        except OSError:
+            pass
+        print(f"  {name}: {'EXISTS' if name in sizes else 'NOT FOUND'}", file=out)
+
+    print("\n", file=out)
+    # Flush before forking so workers do not inherit buffered output
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+
+    # The files are independent, so analyze them in parallel and print in order
+    with ProcessPoolExecutor(max_workers=len(FILES)) as executor:
+        reports = {}
+        for name, filepath in FILES.items():
+            if name not in sizes:
+                continue
+            if not use_pandas:
+                reports[name] = executor.submit(analyze_with_openpyxl, filepath, name)
+            elif sizes[name] > STREAMING_MIN_SIZE:
+                reports[name] = executor.submit(analyze_with_openpyxl, filepath, name, large_file=True)
+            else:
+                reports[name] = executor.submit(analyze_with_pandas, filepath, name)
+        summary = []
+        preview = []
+        for name in FILES:
+            if name not in reports:
+                sys.stdout.write(f"\nSKIPPING {name}: File not found\n")
+                continue
+            report, file_summary, file_preview = reports[name].result()
+            sys.stdout.write(report)
+            summary.extend(file_summary)
+            preview.extend(file_preview)
+
+    # Keep machine-readable results next to the report for follow-up questions
+    if use_pandas and reports:
+        summary_path = write_table(summary, SUMMARY_COLUMNS, SUMMARY_PATH)
+        preview_path = write_table(preview, PREVIEW_COLUMNS, PREVIEW_PATH)
+        sys.stdout.write(f"\nStructured results: {summary_path}, {preview_path}\n")
+
+    sys.stdout.write(f"\n{'='*100}\nANALYSIS COMPLETE\n{'='*100}\n")
 
 
 if __name__ == "__main__":